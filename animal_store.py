@@ -0,0 +1,206 @@
+import json
+import os
+import shlex
+import sqlite3
+
+# Local indexed animal store. API results and the bundled animals_data.json
+# are ingested into SQLite with indexes on name, diet, type, location and the
+# taxonomy fields, so filtered searches run locally without network calls.
+
+DEFAULT_STORE_FILE = os.environ.get("ANIMAL_STORE_FILE", ".animals_store.sqlite3")
+DATASET_FILE = 'animals_data.json'
+
+TAXONOMY_FIELDS = ("kingdom", "phylum", "class", "order", "family", "genus", "scientific_name")
+
+# Filter names accepted by AnimalStore.search, besides the taxonomy fields
+FILTER_FIELDS = ("name", "contains", "diet", "type", "location") + TAXONOMY_FIELDS
+
+
+def _text(value):
+    return value.strip() if isinstance(value, str) else None
+
+
+class AnimalStore:
+    """ SQLite-backed catalogue of animal records with indexed filtered search. """
+
+    def __init__(self, path=DEFAULT_STORE_FILE):
+        self.path = path
+        taxonomy_columns = "".join(f', "{field}" TEXT COLLATE NOCASE' for field in TAXONOMY_FIELDS)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS animals ("
+                " id INTEGER PRIMARY KEY,"
+                " name TEXT NOT NULL UNIQUE COLLATE NOCASE,"
+                " diet TEXT COLLATE NOCASE,"
+                " type TEXT COLLATE NOCASE"
+                f"{taxonomy_columns},"
+                " record TEXT NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS locations ("
+                " animal_id INTEGER NOT NULL REFERENCES animals (id) ON DELETE CASCADE,"
+                " location TEXT NOT NULL COLLATE NOCASE)"
+            )
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            for column in ("diet", "type") + TAXONOMY_FIELDS:
+                conn.execute(f'CREATE INDEX IF NOT EXISTS animals_{column} ON animals ("{column}")')
+            conn.execute("CREATE INDEX IF NOT EXISTS locations_location"
+                         " ON locations (location, animal_id)")
+            conn.execute("CREATE INDEX IF NOT EXISTS locations_animal ON locations (animal_id)")
+            self.has_trigram = self._create_name_index(conn)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        return conn
+
+    @staticmethod
+    def _create_name_index(conn):
+        """
+        Creates the trigram full-text index used for substring name searches.
+        Returns False when this SQLite build has no FTS5 trigram tokenizer;
+        substring searches then fall back to a table scan.
+        """
+        try:
+            conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS animal_names"
+                         " USING fts5(name, tokenize='trigram')")
+            return True
+        except sqlite3.OperationalError:
+            return False
+
+    # --- Ingest ---
+
+    def ingest(self, animals_data):
+        """ Inserts or updates animal records (matched by name). Returns the number stored. """
+        stored = 0
+        with self._connect() as conn:
+            for animal_obj in animals_data:
+                if not isinstance(animal_obj, dict) or _text(animal_obj.get("name")) is None:
+                    continue
+                self._upsert(conn, animal_obj)
+                stored += 1
+        return stored
+
+    def _upsert(self, conn, animal_obj):
+        name = _text(animal_obj["name"])
+        characteristics = animal_obj.get("characteristics")
+        taxonomy = animal_obj.get("taxonomy")
+        characteristics = characteristics if isinstance(characteristics, dict) else {}
+        taxonomy = taxonomy if isinstance(taxonomy, dict) else {}
+
+        row = conn.execute("SELECT id FROM animals WHERE name = ?", (name,)).fetchone()
+        if row is not None:
+            conn.execute("DELETE FROM animals WHERE id = ?", row)
+            if self.has_trigram:
+                conn.execute("DELETE FROM animal_names WHERE rowid = ?", row)
+
+        columns = ["name", "diet", "type"] + [f'"{field}"' for field in TAXONOMY_FIELDS] + ["record"]
+        values = ([name, _text(characteristics.get("diet")), _text(characteristics.get("type"))]
+                  + [_text(taxonomy.get(field)) for field in TAXONOMY_FIELDS]
+                  + [json.dumps(animal_obj, ensure_ascii=False)])
+        animal_id = conn.execute(
+            f"INSERT INTO animals ({', '.join(columns)}) VALUES ({', '.join('?' * len(values))})",
+            values,
+        ).lastrowid
+
+        locations = animal_obj.get("locations")
+        if isinstance(locations, list):
+            conn.executemany("INSERT INTO locations (animal_id, location) VALUES (?, ?)",
+                             [(animal_id, _text(location)) for location in locations
+                              if _text(location)])
+        if self.has_trigram:
+            conn.execute("INSERT INTO animal_names (rowid, name) VALUES (?, ?)", (animal_id, name))
+
+    def ingest_dataset(self, file_path=DATASET_FILE):
+        """
+        Ingests a JSON dataset file unless the same version (by mtime) was
+        already ingested. Returns the number of records stored.
+        """
+        mtime = str(os.stat(file_path).st_mtime_ns)
+        key = f"dataset:{os.path.abspath(file_path)}"
+        with self._connect() as conn:
+            row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        if row is not None and row[0] == mtime:
+            return 0
+
+        with open(file_path, "r", encoding='utf-8') as handle:
+            stored = self.ingest(json.load(handle))
+        with self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, mtime))
+        return stored
+
+    # --- Queries ---
+
+    def search(self, name=None, contains=None, diet=None, type=None, location=None,
+               limit=None, **taxonomy):
+        """
+        Returns the animal records matching every given filter, ordered by name.
+        `name` matches a name prefix, `contains` a substring of the name; the
+        other filters (diet, type, location, taxonomy fields) match whole values.
+        All comparisons are case-insensitive.
+        """
+        unknown = set(taxonomy) - set(TAXONOMY_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown filter(s): {', '.join(sorted(unknown))}")
+
+        clauses, params = [], []
+        if name:
+            # Range scan on the NOCASE name index instead of an unindexable LIKE
+            clauses.append("a.name >= ? AND a.name < ?")
+            params += [name, name + "\U0010ffff"]
+        if contains:
+            if self.has_trigram and len(contains) >= 3:
+                clauses.append("a.id IN (SELECT rowid FROM animal_names WHERE animal_names MATCH ?)")
+                params.append('"' + contains.replace('"', '""') + '"')
+            else:
+                clauses.append("instr(lower(a.name), ?) > 0")
+                params.append(contains.lower())
+        for column, value in [("diet", diet), ("type", type)] + list(taxonomy.items()):
+            if value:
+                clauses.append(f'a."{column}" = ?')
+                params.append(value)
+        if location:
+            clauses.append("a.id IN (SELECT animal_id FROM locations WHERE location = ?)")
+            params.append(location)
+
+        sql = "SELECT a.record FROM animals a"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY a.name"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+
+        with self._connect() as conn:
+            return [json.loads(row[0]) for row in conn.execute(sql, params)]
+
+    def count(self):
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM animals").fetchone()[0]
+
+
+def open_store(path=DEFAULT_STORE_FILE, dataset_file=DATASET_FILE):
+    """ Opens the local animal store, ingesting the bundled dataset if it changed. """
+    store = AnimalStore(path)
+    try:
+        store.ingest_dataset(dataset_file)
+    except (OSError, ValueError) as e:
+        print(f"WARNING: Could not ingest {dataset_file}. Details: {e}")
+    return store
+
+
+def parse_filters(query):
+    """
+    Parses a query such as "diet=carnivore location=eurasia" into search
+    keyword arguments. Quote values that contain spaces: name="arctic fox".
+    """
+    filters = {}
+    for part in shlex.split(query):
+        field, found, value = part.partition("=")
+        field = field.strip().lower()
+        if not found or field not in FILTER_FIELDS:
+            raise ValueError(f"Invalid filter '{part}'. Use field=value with one of: "
+                             f"{', '.join(FILTER_FIELDS)}")
+        filters[field] = value.strip()
+    return filters
@@ -0,0 +1,173 @@
+import json
+import threading
+import time
+import traceback
+from collections import OrderedDict
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import animal_store
+import animals_web_generator
+import data_fetcher
+import template_engine
+
+# Resident server mode: renders animal pages on demand over HTTP while the
+# template, the pooled API session and fetched records stay warm in memory.
+#
+#   GET /animals?name=fox                          -> HTML page from the API
+#   GET /animals?diet=carnivore&location=eurasia   -> HTML page from the local store
+#   add &format=json for the raw records
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8000
+RECORD_TTL_SECONDS = 300
+MAX_RECORD_ENTRIES = 1000
+
+
+class SingleFlight:
+    """ Coalesces concurrent calls with the same key into one execution. """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, function):
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+        if not leader:
+            return future.result()
+
+        try:
+            future.set_result(function())
+        except Exception as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                del self._calls[key]
+        return future.result()
+
+
+class AnimalService:
+    """
+    Answers record lookups for the server. API results are kept in an
+    in-memory LRU (on top of the on-disk response cache) for `ttl` seconds,
+    and identical concurrent lookups share one fetch or query.
+    """
+
+    def __init__(self, ttl=RECORD_TTL_SECONDS, max_entries=MAX_RECORD_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.store = animal_store.open_store()
+        self._records = OrderedDict()
+        self._lock = threading.Lock()
+        self._flight = SingleFlight()
+
+    def lookup(self, params):
+        """
+        Returns the records for a request: `name` is fetched from the API,
+        any other filters are answered from the local store.
+        """
+        filters = {field: value for field, value in params.items()
+                   if field in animal_store.FILTER_FIELDS and value}
+        if not filters:
+            raise ValueError("Give a name or filters, e.g. /animals?name=fox "
+                             "or /animals?diet=carnivore&location=eurasia")
+        if set(filters) == {"name"}:
+            return self._fetch(filters["name"])
+        key = ("query",) + tuple(sorted(filters.items()))
+        return self._flight.do(key, lambda: self.store.search(**filters))
+
+    def _fetch(self, animal_name):
+        key = ("name", animal_name.strip().lower())
+        with self._lock:
+            cached = self._records.get(key)
+            if cached is not None and cached[0] > time.monotonic():
+                self._records.move_to_end(key)
+                return cached[1]
+        return self._flight.do(key, lambda: self._fetch_and_remember(key, animal_name))
+
+    def _fetch_and_remember(self, key, animal_name):
+        records = data_fetcher.fetch_data(animal_name)
+        if isinstance(records, list):
+            with self._lock:
+                self._records[key] = (time.monotonic() + self.ttl, records)
+                self._records.move_to_end(key)
+                while len(self._records) > self.max_entries:
+                    self._records.popitem(last=False)
+            self.store.ingest(records)
+        return records
+
+    @staticmethod
+    def render(records):
+        """ Renders the records into the (cached) page template. """
+        head, tail = template_engine.load_template(animals_web_generator.TEMPLATE_FILE)
+        render_card = template_engine.load_card_renderer(animals_web_generator.SCHEMA_FILE)
+        return "".join([head] + [render_card(animal_obj) for animal_obj in records] + [tail])
+
+
+class AnimalRequestHandler(BaseHTTPRequestHandler):
+    service = None
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path not in ("/", "/animals"):
+            self._send(404, "text/plain", "Not found\n")
+            return
+
+        params = {field: values[-1] for field, values in parse_qs(url.query).items()}
+        try:
+            records = self.service.lookup(params)
+        except ValueError as e:
+            self._send(400, "text/plain", f"{e}\n")
+            return
+        except Exception:
+            self._send_internal_error()
+            return
+        if not isinstance(records, list):
+            self._send(502, "text/plain", "Data fetching failed or data structure is invalid.\n")
+            return
+
+        try:
+            if params.get("format") == "json":
+                content_type, body = "application/json", json.dumps(records, ensure_ascii=False)
+            else:
+                content_type, body = "text/html; charset=utf-8", self.service.render(records)
+        except Exception:
+            self._send_internal_error()
+            return
+        self._send(200, content_type, body)
+
+    def _send_internal_error(self):
+        """ Logs the current exception (e.g. a locked store) and answers 500 instead of hanging up. """
+        self.log_error("%s failed:\n%s", self.path, traceback.format_exc())
+        self._send(500, "text/plain", "Internal server error.\n")
+
+    def _send(self, status, content_type, body):
+        payload = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+def serve(host=DEFAULT_HOST, port=DEFAULT_PORT):
+    """ Runs the server until interrupted. """
+    data_fetcher.stale_while_revalidate = True
+    AnimalRequestHandler.service = AnimalService()
+    server = ThreadingHTTPServer((host, port), AnimalRequestHandler)
+    print(f"Serving animal pages on http://{host}:{port}/animals?name=... (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    serve()
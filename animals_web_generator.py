@@ -1,4 +1,19 @@
+import argparse
+import json
+import os
+import sys
+
+import animal_store
 import data_fetcher  #  Import the data fetcher module
+import incremental
+import instrumentation
+import template_engine
+
+# Constants for file paths and placeholder
+TEMPLATE_FILE = 'animals_template.html'
+SCHEMA_FILE = template_engine.SCHEMA_FILE
+OUTPUT_FILE = 'animals.html'
+PLACEHOLDER = template_engine.PLACEHOLDER
 
 
 # The load_data function is removed as it's no longer needed for a static file.
@@ -14,97 +29,293 @@ def read_template(file_path):
 
 # --- 2. Serialization Function ---
 
-def serialize_animal(animal_obj):
+def serialize_animal(animal_obj, render_card=None):
     """
     Serializes a single animal dictionary into the required HTML card structure.
+    The rendered fields come from card_schema.json.
     Returns the HTML string for one <li> element.
     """
-    if not isinstance(animal_obj, dict):
-        return ''
+    if render_card is None:
+        render_card = template_engine.load_card_renderer(SCHEMA_FILE)
+    return render_card(animal_obj)
 
-    characteristics = animal_obj.get("characteristics", {})
-    animal_html = ''
 
-    # Start the HTML serialization: <li class="cards__item">
-    animal_html += '<li class="cards__item">\n'
+# --- 3. Page Rendering ---
 
-    # 1. Name: Use <div class="card__title">
-    if "name" in animal_obj and isinstance(animal_obj["name"], str):
-        name = animal_obj["name"].strip()
-        animal_html += f'  <div class="card__title">{name}</div>\n'
+def write_page(animals_data, output_file=OUTPUT_FILE):
+    """
+    Streams the animals into the template and writes the page to `output_file`,
+    skipping the write when nothing changed since the last run (see incremental.py).
+    Returns "written", "identical" or "unchanged" on success, False if the
+    template could not be read or the file written.
+    """
+    # Load the (cached) template, split at the placeholder, and the card renderer
+    try:
+        with instrumentation.stage("template"):
+            head, tail = template_engine.load_template(TEMPLATE_FILE)
+            render_card = template_engine.load_card_renderer(SCHEMA_FILE)
+    except Exception as e:
+        print(f"ERROR: Could not read template file. Details: {e}")
+        return False
 
-    # Use a list to build the <p class="card__text"> content only if data is present
-    p_content = []
+    # Write the cards to the output file as they are generated
+    try:
+        with instrumentation.stage("render+write"):
+            status = incremental.write_if_changed(output_file, animals_data, head, tail,
+                                                  render_card, [TEMPLATE_FILE, SCHEMA_FILE])
+        instrumentation.count(f"pages {status}")
+        return status
+    except Exception as e:
+        print(f"\nERROR: Could not write to {output_file}. Details: {e}")
+        return False
 
-    # 2. Diet
-    if "diet" in characteristics and isinstance(characteristics["diet"], str):
-        p_content.append(f'      <strong>Diet:</strong> {characteristics["diet"]}<br/>\n')
 
-    # 3. First Location
-    if ("locations" in animal_obj and
-            isinstance(animal_obj["locations"], list) and
-            animal_obj["locations"] and
-            isinstance(animal_obj["locations"][0], str)):
-        p_content.append(f'      <strong>Location:</strong> {animal_obj["locations"][0]}<br/>\n')
+def page_file_name(animal_name):
+    """ Returns the output file name used for one name in per-name batch mode. """
+    slug = "".join(c if c.isalnum() else "_" for c in animal_name.strip().lower())
+    return f"animals_{slug}.html"
 
-    # 4. Type
-    if "type" in characteristics and isinstance(characteristics["type"], str):
-        p_content.append(f'      <strong>Type:</strong> {characteristics["type"]}<br/>\n')
 
-    # Add the <p class="card__text"> block only if characteristics were found
-    if p_content:
-        animal_html += '  <p class="card__text">\n'
-        animal_html += "".join(p_content)
-        animal_html += '  </p>\n'
+def print_cache_stats():
+    if data_fetcher.cache is not None:
+        print(f"Cache stats: {data_fetcher.cache.stats}")
+    if instrumentation.enabled:
+        api_timings = [seconds for _, seconds in data_fetcher.fetcher.timings]
+        instrumentation.count("api requests", len(api_timings))
+        if api_timings:
+            instrumentation.count("api mean ms", round(1000 * sum(api_timings) / len(api_timings), 2))
+        print(instrumentation.report())
 
-    # End the HTML serialization for the current animal card
-    animal_html += '</li>\n'
 
-    return animal_html
+# --- 4. Main Script Execution ---
 
+def search_local(query):
+    """
+    Answers a filter query such as "diet=carnivore location=eurasia" from
+    the local store, without any network request. Returns None if the
+    query is invalid.
+    """
+    try:
+        filters = animal_store.parse_filters(query)
+        return animal_store.open_store().search(**filters)
+    except ValueError as e:
+        print(f"ERROR: {e}")
+        return None
 
-# --- 3. Main Script Execution ---
 
 def main():
     """Main function to orchestrate data fetching, serialization, replacement, and writing."""
 
-    # Constants for file paths and placeholder
-    TEMPLATE_FILE = 'animals_template.html'
-    OUTPUT_FILE = 'animals.html'
-    PLACEHOLDER = '__REPLACE_ANIMALS_INFO__'
+    animal_name = input("Please enter an animal to search for (e.g., 'tiger'),\n"
+                        "or filters to search locally (e.g., 'diet=carnivore location=eurasia'): ")
 
-    # --- NEW DATA FETCHING LOGIC ---
-    animal_name = input("Please enter an animal to search for (e.g., 'tiger'): ")
-    animals_data = data_fetcher.fetch_data(animal_name)
-    # ---------------------------------
+    if "=" in animal_name:
+        # Filtered search answered from the local store
+        with instrumentation.stage("local search"):
+            animals_data = search_local(animal_name)
+        if animals_data is not None and not animals_data:
+            print(f"No local animals match '{animal_name}'.")
+            return
+    else:
+        # --- NEW DATA FETCHING LOGIC ---
+        with instrumentation.stage("fetch"):
+            animals_data = data_fetcher.fetch_data(animal_name)
+        # ---------------------------------
+        if animals_data and isinstance(animals_data, list):
+            with instrumentation.stage("store ingest"):
+                animal_store.open_store().ingest(animals_data)
 
     if not (animals_data and isinstance(animals_data, list)):
         print("Script terminated: Data fetching failed or data structure is invalid.")
         return
+    instrumentation.count("animals", len(animals_data))
 
-    # Generate a single string with the animals' data serialized as the final HTML card
-    animals_output_string = ''
-    for animal_obj in animals_data:
-        animals_output_string += serialize_animal(animal_obj)
+    status = write_page(animals_data, OUTPUT_FILE)
+    if status == "written":
+        print(f"\nSUCCESS! Content for '{animal_name}' fully serialized into HTML and written to {OUTPUT_FILE}")
+    elif status:
+        print(f"\nNo changes for '{animal_name}': {OUTPUT_FILE} is already up to date.")
 
-    # Read the content of the template
-    try:
-        template_content = read_template(TEMPLATE_FILE)
-    except Exception as e:
-        print(f"ERROR: Could not read template file. Details: {e}")
-        return
+    print_cache_stats()
 
-    # Replace the placeholder with the generated string
-    final_html_content = template_content.replace(PLACEHOLDER, animals_output_string)
 
-    # Write the new HTML content to a new file, animals.html
-    try:
-        with open(OUTPUT_FILE, "w", encoding='utf-8') as f:
-            f.write(final_html_content)
-        print(f"\nSUCCESS! Content for '{animal_name}' fully serialized into HTML and written to {OUTPUT_FILE}")
-    except Exception as e:
-        print(f"\nERROR: Could not write to {OUTPUT_FILE}. Details: {e}")
+def read_names(handle):
+    """ Reads one animal name per line, skipping blank lines and '#' comments. """
+    names = []
+    for line in handle:
+        name = line.strip()
+        if name and not name.startswith("#"):
+            names.append(name)
+    return names
+
+
+def fetch_and_ingest(names, max_workers=8):
+    """
+    Fetches all `names` concurrently, warns about names without data and
+    ingests the results into the local store.
+    Returns a dict mapping each name that returned data to its records.
+    """
+    with instrumentation.stage("fetch"):
+        results = data_fetcher.fetch_many(names, max_workers=max_workers)
+    fetched = {name: data for name, data in results.items() if isinstance(data, list)}
+    for name in results:
+        if name not in fetched:
+            print(f"WARNING: No data for '{name}', skipping.")
+    instrumentation.count("names", len(results))
+    instrumentation.count("names failed", len(results) - len(fetched))
+    if fetched:
+        with instrumentation.stage("store ingest"):
+            animal_store.open_store().ingest(animal for data in fetched.values() for animal in data)
+    return fetched
+
+
+def batch_main(names, per_name=False, max_workers=8, output_file=OUTPUT_FILE):
+    """
+    Fetches all `names` concurrently and renders either one combined page
+    (`output_file`) or one page per name next to it.
+    Returns True if the pages were written or already up to date.
+    """
+    results = fetch_and_ingest(names, max_workers)
+    if not results:
+        print("Script terminated: Data fetching failed for every name.")
+        print_cache_stats()
+        return False
+
+    if per_name:
+        written = 0
+        output_dir = os.path.dirname(output_file)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+        for name, animals_data in results.items():
+            if write_page(animals_data, os.path.join(output_dir, page_file_name(name))):
+                written += 1
+        print(f"\nSUCCESS! Wrote {written} pages for {len(results)} names.")
+        ok = written == len(results)
+    else:
+        # A list (not a generator) lets write_page skip unchanged runs via the manifest
+        combined = [animal for data in results.values() for animal in data]
+        status = write_page(combined, output_file)
+        if status == "written":
+            print(f"\nSUCCESS! Animals for {len(results)} names written to {output_file}")
+        elif status:
+            print(f"\nNo changes: {output_file} is already up to date.")
+        ok = bool(status)
+
+    print_cache_stats()
+    return ok
+
+
+def export_records(animals_data, output_format, output):
+    """ Writes records as a JSON file or as a sharded site. Returns True on success. """
+    if output_format == "json":
+        try:
+            with open(output, "w", encoding='utf-8') as f:
+                json.dump(animals_data, f, ensure_ascii=False, indent=2)
+        except OSError as e:
+            print(f"\nERROR: Could not write to {output}. Details: {e}")
+            return False
+        print(f"\nSUCCESS! {len(animals_data)} animals written to {output}")
+        return True
+
+    import site_builder
+    with instrumentation.stage("site build"):
+        page_count, written = site_builder.build_site(animals_data, output)
+    print(f"\nSUCCESS! Built {page_count} pages for {len(animals_data)} animals in {output}/ "
+          f"({written} changed).")
+    return True
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        description="Generate animal pages. Without arguments, asks for a name interactively.")
+    parser.add_argument("names", nargs="*", help="animal names to fetch from the API")
+    parser.add_argument("--names-file", metavar="FILE",
+                        help="read names from FILE, one per line ('-' for stdin)")
+    parser.add_argument("--query", metavar="FILTERS",
+                        help="search the local store instead, e.g. 'diet=carnivore location=eurasia'")
+    parser.add_argument("--format", choices=("html", "json", "site"), default="html",
+                        help="single HTML page, raw JSON records, or a sharded site (default: html)")
+    parser.add_argument("--output", "-o",
+                        help="output file, or directory for --format site "
+                             f"(default: {OUTPUT_FILE}, animals.json or site)")
+    parser.add_argument("--per-name", action="store_true",
+                        help="with --format html, write one page per name")
+    parser.add_argument("--workers", type=int, default=8, help="concurrent fetches (default: 8)")
+    parser.add_argument("--profile", action="store_true",
+                        help="print per-stage timings and counters at the end of the run")
+    parser.add_argument("--serve", action="store_true",
+                        help="run the resident HTTP server instead of generating files")
+    parser.add_argument("--host", default="127.0.0.1", help="server host (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8000, help="server port (default: 8000)")
+    return parser, parser.parse_args(argv)
+
+
+def cli(argv=None):
+    """
+    Non-interactive entry point. Without arguments (other than --profile) it
+    falls back to the interactive prompt. Returns the process exit code.
+    """
+    if argv is None:
+        argv = sys.argv[1:]
+    parser, args = parse_args(argv)
+    if args.profile:
+        instrumentation.enable()
+
+    if args.serve:
+        import animals_server
+        animals_server.serve(args.host, args.port)
+        return 0
+
+    names = list(args.names)
+    if args.names_file == "-":
+        names += read_names(sys.stdin)
+    elif args.names_file:
+        try:
+            with open(args.names_file, "r", encoding='utf-8') as names_file:
+                names += read_names(names_file)
+        except OSError as e:
+            parser.error(f"cannot read --names-file {args.names_file}: {e.strerror}")
+
+    if names and args.query:
+        parser.error("give either names or --query, not both")
+    if not names and not args.query:
+        # Only a bare run (optionally with --profile) is interactive; a
+        # scripted run with an empty names file must not wait for input
+        if [arg for arg in argv if arg != "--profile"]:
+            parser.error("no names given")
+        main()
+        return 0
+    if args.per_name and (args.query or args.format != "html"):
+        parser.error("--per-name only applies to names with --format html")
+
+    default_output = {"html": OUTPUT_FILE, "json": "animals.json", "site": "site"}[args.format]
+    output = args.output or default_output
+
+    if args.format == "html" and not args.query:
+        return 0 if batch_main(names, args.per_name, args.workers, output) else 1
+
+    if args.query:
+        with instrumentation.stage("local search"):
+            animals_data = search_local(args.query)
+    else:
+        results = fetch_and_ingest(names, args.workers)
+        animals_data = [animal for data in results.values() for animal in data]
+    if not animals_data:
+        print("Script terminated: No animals found.")
+        print_cache_stats()
+        return 1
+
+    if args.format == "html":
+        ok = bool(write_page(animals_data, output))
+        if ok:
+            print(f"\nSUCCESS! {len(animals_data)} animals written to {output}")
+    else:
+        ok = export_records(animals_data, args.format, output)
+    print_cache_stats()
+    return 0 if ok else 1
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    # Interactive without arguments; see --help for the non-interactive CLI
+    # (names, --names-file, --query, --format, --output) and --serve.
+    sys.exit(cli())
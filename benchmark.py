@@ -0,0 +1,208 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import animals_web_generator
+import data_fetcher
+import incremental
+import template_engine
+
+# Benchmark harness for the fetch -> serialize -> write pipeline.
+# Datasets are synthesized from the shape of animals_data.json; results are
+# written as JSON so runs from different versions can be compared:
+#
+#   python benchmark.py --output before.json
+#   python benchmark.py --output after.json --compare before.json
+
+DATASET_FILE = 'animals_data.json'
+DEFAULT_SIZES = "10,1000,100000,1000000"
+
+
+def synthetic_dataset(size, source_file=DATASET_FILE):
+    """
+    Returns `size` animal records shaped like the bundled dataset.
+    Records cycle through the real ones with unique names; the nested
+    characteristics/taxonomy dicts are shared to keep large datasets small.
+    """
+    with open(source_file, "r", encoding='utf-8') as handle:
+        samples = json.load(handle)
+    return [dict(samples[i % len(samples)], name=f"{samples[i % len(samples)]['name']} {i}")
+            for i in range(size)]
+
+
+@contextmanager
+def mocked_fetch(latency, records_per_name=3):
+    """
+    Replaces data_fetcher.fetch_data with a fake that sleeps `latency`
+    seconds and returns synthetic records, so no network or API key is needed.
+    """
+    samples = synthetic_dataset(records_per_name)
+
+    def fake_fetch(animal_name):
+        time.sleep(latency)
+        return [dict(animal_obj, name=f"{animal_name} {animal_obj['name']}") for animal_obj in samples]
+
+    original = data_fetcher.fetch_data
+    data_fetcher.fetch_data = fake_fetch
+    try:
+        yield fake_fetch
+    finally:
+        data_fetcher.fetch_data = original
+
+
+def measure(function, with_memory=True):
+    """
+    Runs `function` and returns (result, seconds, peak_bytes). Timing and
+    peak memory come from separate runs, since tracemalloc slows Python down.
+    """
+    started = time.perf_counter()
+    result = function()
+    seconds = time.perf_counter() - started
+    peak = None
+    if with_memory:
+        del result
+        tracemalloc.start()
+        try:
+            result = function()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return result, seconds, peak
+
+
+def bench_pipeline(size, with_memory=True):
+    """ Times each rendering stage for one dataset size. Returns result rows. """
+    animals_data = synthetic_dataset(size)
+    render_card = template_engine.load_card_renderer(animals_web_generator.SCHEMA_FILE)
+    template_content = animals_web_generator.read_template(animals_web_generator.TEMPLATE_FILE)
+    rows = []
+
+    def record(stage, function):
+        result, seconds, peak = measure(function, with_memory)
+        rows.append({"stage": stage, "size": size, "seconds": round(seconds, 6),
+                     "peak_bytes": peak})
+        print(f"{stage:<24} {size:>9}  {seconds * 1000:12.2f} ms"
+              + (f"  {peak / 1e6:10.2f} MB" if peak is not None else ""))
+        return result
+
+    cards = record("serialize_animal", lambda: [animals_web_generator.serialize_animal(a, render_card)
+                                                for a in animals_data])
+    cards_string = record("page assembly", lambda: "".join(cards))
+    page = record("template substitution",
+                  lambda: template_content.replace(animals_web_generator.PLACEHOLDER, cards_string))
+    del cards, cards_string
+
+    with tempfile.TemporaryDirectory() as directory:
+        output_file = os.path.join(directory, "animals.html")
+
+        def write_file():
+            with open(output_file, "w", encoding='utf-8') as handle:
+                handle.write(page)
+
+        record("file write", write_file)
+        del page
+        bench_write_page(animals_data, directory, record)
+    return rows
+
+
+def bench_write_page(animals_data, directory, record):
+    """
+    Times the production write path (write_page -> incremental.write_if_changed)
+    in `directory`: with no manifest, with a warm manifest (nothing changed),
+    and with streamed records, which skip the manifest check and are rendered
+    from the warm fragment cache, then compared byte for byte.
+    """
+    for file_name in (animals_web_generator.TEMPLATE_FILE, animals_web_generator.SCHEMA_FILE):
+        shutil.copy(file_name, directory)
+    previous_dir = os.getcwd()
+    os.chdir(directory)
+    try:
+        def cold():
+            for file_name in (incremental.MANIFEST_FILE, incremental.FRAGMENT_FILE,
+                              animals_web_generator.OUTPUT_FILE):
+                if os.path.exists(file_name):
+                    os.remove(file_name)
+            return animals_web_generator.write_page(animals_data)
+
+        record("write_page cold", cold)
+        record("write_page warm", lambda: animals_web_generator.write_page(animals_data))
+        record("write_page warm streamed", lambda: animals_web_generator.write_page(iter(animals_data)))
+    finally:
+        os.chdir(previous_dir)
+
+
+def bench_fetch(names, latency, max_workers):
+    """ Times a concurrent batch fetch against the mocked fetcher. """
+    animal_names = [f"animal {i}" for i in range(names)]
+    with mocked_fetch(latency):
+        started = time.perf_counter()
+        data_fetcher.fetch_many(animal_names, max_workers=max_workers)
+        seconds = time.perf_counter() - started
+    print(f"{'fetch_many':<24} {names:>9}  {seconds * 1000:12.2f} ms"
+          f"  ({latency * 1000:.0f} ms latency, {max_workers} workers)")
+    return {"stage": "fetch_many", "size": names, "seconds": round(seconds, 6),
+            "peak_bytes": None, "latency": latency, "workers": max_workers}
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_file):
+    """ Prints the time ratio of each stage against a previous results file. """
+    with open(baseline_file, "r", encoding='utf-8') as handle:
+        baseline = {(row["stage"], row["size"]): row for row in json.load(handle)["results"]}
+    print(f"\n--- Compared with {baseline_file} (new / old time) ---")
+    for row in results:
+        old = baseline.get((row["stage"], row["size"]))
+        if old and old["seconds"]:
+            print(f"{row['stage']:<24} {row['size']:>9}  {row['seconds'] / old['seconds']:8.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the animal page pipeline.")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES,
+                        help=f"comma-separated dataset sizes (default: {DEFAULT_SIZES})")
+    parser.add_argument("--no-memory", action="store_true",
+                        help="skip the tracemalloc peak-memory runs")
+    parser.add_argument("--fetch-names", type=int, default=100,
+                        help="number of names for the mocked fetch benchmark (0 to skip)")
+    parser.add_argument("--latency", type=float, default=0.05,
+                        help="mocked fetch latency in seconds")
+    parser.add_argument("--workers", type=int, default=8, help="fetch worker pool size")
+    parser.add_argument("--output", default="bench_results.json", help="results JSON file")
+    parser.add_argument("--compare", help="previous results JSON file to compare against")
+    args = parser.parse_args()
+
+    results = []
+    for size in (int(size) for size in args.sizes.split(",") if size.strip()):
+        results.extend(bench_pipeline(size, with_memory=not args.no_memory))
+    if args.fetch_names:
+        results.append(bench_fetch(args.fetch_names, args.latency, args.workers))
+
+    report = {
+        "meta": {"revision": git_revision(), "python": platform.python_version(),
+                 "platform": platform.platform(), "timestamp": time.time()},
+        "results": results,
+    }
+    with open(args.output, "w", encoding='utf-8') as handle:
+        json.dump(report, handle, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,27 +1,160 @@
 import requests
 import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
 from dotenv import load_dotenv
 
+from response_cache import ResponseCache, normalize_key
+
 load_dotenv()
 
+API_URL = os.environ.get("API_URL", "https://api.api-ninjas.com/v1/animals")
+
+# Retry settings for rate-limited (429) and server-side (5xx) failures.
+MAX_RETRIES = 4
+BACKOFF_BASE_SECONDS = 0.5
+MAX_BACKOFF_SECONDS = 30
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# Shared on-disk cache; set ANIMAL_CACHE_DISABLED=1 to always hit the API.
+cache = None if os.environ.get("ANIMAL_CACHE_DISABLED") else ResponseCache()
+
+# Serve stale cache entries while refreshing them in the background.
+# Only long-running processes (the server) enable this: a one-shot CLI run
+# would exit before the refresh finishes, so it refetches stale entries instead.
+stale_while_revalidate = False
+
+
+class RateLimiter:
+    """ Spaces out requests to each host to at most `rate` per second. """
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next_slot = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url):
+        if not self.interval:
+            return
+        host = urlsplit(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+rate_limiter = RateLimiter(float(os.environ.get("API_RATE_LIMIT", 10)))
+
+
+class AnimalFetcher:
+    """
+    Reusable API client that owns a pooled, keep-alive `requests.Session`.
+    Connections are reused across lookups and threads, and the latency of
+    every request is recorded in `timings` as (animal_name, seconds) pairs
+    (the most recent `max_timings` are kept).
+    """
+
+    def __init__(self, api_url=API_URL, api_key=None, pool_size=10,
+                 timeout=(3.05, 10), limiter=rate_limiter, max_timings=1000):
+        self.api_url = api_url
+        self.api_key = api_key
+        self.timeout = timeout
+        self.limiter = limiter
+        self.timings = deque(maxlen=max_timings)
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size,
+                                                pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({"Accept-Encoding": "gzip, deflate",
+                                     "Connection": "keep-alive"})
+
+    def fetch(self, animal_name):
+        """ Queries the API for `animal_name`, retrying 429/5xx responses with backoff. """
+        api_key = self.api_key or os.environ.get("API_KEY")
+        if not api_key:
+            print("Error!!! dotenv not found")
+            print("Please create dotenv file, and try it again")
+            return None
+
+        headers = {"X-Api-Key": api_key}
+
+        for attempt in range(MAX_RETRIES + 1):
+            self.limiter.wait(self.api_url)
+            # Only the request itself is timed; backoff sleeps happen outside
+            started = time.perf_counter()
+            try:
+                response = self.session.get(self.api_url, params={"name": animal_name},
+                                            headers=headers, timeout=self.timeout)
+            except requests.exceptions.RequestException as e:
+                self.timings.append((animal_name, time.perf_counter() - started))
+                if (isinstance(e, (requests.exceptions.ConnectionError, requests.exceptions.Timeout))
+                        and attempt < MAX_RETRIES):
+                    _backoff(attempt)
+                    continue
+                print(f"Fehler bei der API-Anfrage: {e}")
+                return None
+            self.timings.append((animal_name, time.perf_counter() - started))
+
+            if response.status_code in RETRY_STATUS_CODES and attempt < MAX_RETRIES:
+                _backoff(attempt, response.headers.get("Retry-After"))
+                continue
+            try:
+                response.raise_for_status()
+                return response.json()
+            except requests.exceptions.RequestException as e:
+                print(f"Fehler bei der API-Anfrage: {e}")
+                print(f"Server-Antwort: {response.text}")
+                return None
+
+    def close(self):
+        self.session.close()
+
+
+# Default client used by the functional API below.
+fetcher = AnimalFetcher(pool_size=int(os.environ.get("API_POOL_SIZE", 10)))
+
+
 def fetch_data(animal_name):
-    global response
-    api_key = os.environ.get("API_KEY")
-    if not api_key:
-        print("Error!!! dotenv not found")
-        print("Please create dotenv file, and try it again")
-        return None
-
-    api_url = f"https://api.api-ninjas.com/v1/animals?name={animal_name}"
-    headers = {"X-Api-Key": api_key}
-
-    try:
-        response = requests.get(api_url, headers=headers)
-        response.raise_for_status()
-        return response.json()
-    except requests.exceptions.RequestException as e:
-        print(f"Fehler bei der API-Anfrage: {e}")
-        if 'response' in locals() and response is not None:
-            print(f"Server-Antwort: {response.text}")
-        return None
+    """ Returns the API results for `animal_name`, served from the cache when possible. """
+    if cache is None:
+        return fetch_from_api(animal_name)
+    return cache.get_or_fetch(animal_name, fetch_from_api, stale_while_revalidate)
+
+
+def fetch_many(animal_names, max_workers=8):
+    """
+    Fetches several names concurrently with a bounded worker pool. Names that
+    differ only in case or spacing are fetched once, under the first spelling.
+    Returns a dict mapping each name to its results (None on failure).
+    """
+    unique_names = {}
+    for animal_name in animal_names:
+        unique_names.setdefault(normalize_key(animal_name), animal_name)
+    unique_names = list(unique_names.values())
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        results = pool.map(fetch_data, unique_names)
+        return dict(zip(unique_names, results))
+
+
+def fetch_from_api(animal_name):
+    """ Queries the API directly, bypassing the cache. """
+    return fetcher.fetch(animal_name)
+
 
+def _backoff(attempt, retry_after=None):
+    """
+    Sleeps before the next retry: Retry-After if given, else jittered
+    exponential backoff, never longer than MAX_BACKOFF_SECONDS.
+    """
+    if retry_after is not None and retry_after.isdigit():
+        delay = float(retry_after)
+    else:
+        delay = BACKOFF_BASE_SECONDS * (2 ** attempt) * random.uniform(0.5, 1.5)
+    time.sleep(min(delay, MAX_BACKOFF_SECONDS))
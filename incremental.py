@@ -0,0 +1,161 @@
+import hashlib
+import json
+import os
+import tempfile
+from collections import OrderedDict
+
+import instrumentation
+
+# Incremental regeneration: a manifest records what each output page was
+# built from (template/schema hashes and a digest of the animal records),
+# so unchanged pages are skipped and unchanged cards are reused from a
+# fragment cache instead of being rendered again.
+
+MANIFEST_FILE = '.animals_manifest.json'
+FRAGMENT_FILE = '.animals_fragments.json'
+MAX_FRAGMENTS = 10000
+
+
+def file_hash(file_path):
+    """ Returns the SHA-256 hex digest of a file, read in chunks. """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def record_hash(animal_obj):
+    """ Returns a content hash for one animal record, independent of key order. """
+    payload = json.dumps(animal_obj, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def sources_hash(source_files):
+    """ Combines the hashes of the files a page is rendered from (template, schema). """
+    return hashlib.sha256("".join(file_hash(path) for path in source_files).encode()).hexdigest()
+
+
+def load_json(file_path, default, object_pairs_hook=None):
+    try:
+        with open(file_path, "r", encoding='utf-8') as handle:
+            return json.load(handle, object_pairs_hook=object_pairs_hook)
+    except (OSError, ValueError):
+        return default
+
+
+def save_json(file_path, data):
+    """ Writes JSON atomically so concurrent readers never see a partial file. """
+    with _atomic_file(file_path) as handle:
+        json.dump(data, handle, ensure_ascii=False)
+
+
+class _atomic_file:
+    """
+    Context manager yielding a temp file next to `file_path`; on success it
+    replaces `file_path` (unless `keep` was set to False), otherwise it is removed.
+    """
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.keep = True
+
+    def __enter__(self):
+        directory = os.path.dirname(os.path.abspath(self.file_path))
+        fd, self.temp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".part")
+        self.handle = os.fdopen(fd, "w", encoding='utf-8')
+        return self.handle
+
+    def __exit__(self, exc_type, exc, tb):
+        self.handle.close()
+        if exc_type is None and self.keep:
+            # mkstemp creates 0600 files; give the result normal file permissions
+            os.chmod(self.temp_path, _default_mode(self.file_path))
+            os.replace(self.temp_path, self.file_path)
+        else:
+            os.remove(self.temp_path)
+        return False
+
+
+def _default_mode(file_path):
+    """ Returns the existing file's mode, or 0666 minus the umask for a new file. """
+    try:
+        return os.stat(file_path).st_mode & 0o777
+    except OSError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
+
+
+def records_digest(animals_data):
+    """ Returns one rolling digest over the content hashes of all records, in order. """
+    digest = hashlib.sha256()
+    for animal_obj in animals_data:
+        digest.update(bytes.fromhex(record_hash(animal_obj)))
+    return digest.hexdigest()
+
+
+def write_if_changed(output_file, animals_data, head, tail, render_card, source_files):
+    """
+    Renders the page to `output_file` only when something changed.
+    Returns "unchanged" when the manifest shows the same inputs produced the
+    current file, "identical" when the rendered bytes match the existing
+    file (which is left untouched), or "written" after an atomic replace.
+
+    Records are hashed and rendered as they stream by, so `animals_data`
+    may be any iterable. Only a list or tuple can be checked against the
+    manifest before rendering; other iterables are rendered and then
+    compared byte for byte.
+    """
+    page_sources = sources_hash(source_files)
+    manifest = load_json(MANIFEST_FILE, {})
+    entry = manifest.get(output_file)
+    old_output_hash = file_hash(output_file) if os.path.exists(output_file) else None
+
+    if (isinstance(animals_data, (list, tuple))
+            and entry and old_output_hash is not None
+            and entry.get("sources") == page_sources
+            and entry.get("output") == old_output_hash
+            and entry.get("records") == records_digest(animals_data)):
+        return "unchanged"
+
+    # Cached cards are only valid for the template/schema they were rendered with
+    fragment_store = load_json(FRAGMENT_FILE, {}, object_pairs_hook=OrderedDict)
+    fragments = fragment_store.get("fragments", OrderedDict())
+    if fragment_store.get("sources") != page_sources:
+        fragments.clear()
+
+    digest = hashlib.sha256()
+    count = rendered = 0
+    output = _atomic_file(output_file)
+    with output as handle:
+        handle.write(head)
+        for animal_obj in animals_data:
+            key = record_hash(animal_obj)
+            digest.update(bytes.fromhex(key))
+            count += 1
+            card = fragments.get(key)
+            if card is None:
+                card = fragments[key] = render_card(animal_obj)
+                rendered += 1
+                # Bound the cache while streaming: drop the least recently used
+                if len(fragments) > MAX_FRAGMENTS:
+                    fragments.popitem(last=False)
+            else:
+                fragments.move_to_end(key)
+            handle.write(card)
+        handle.write(tail)
+        handle.flush()
+        new_output_hash = file_hash(output.temp_path)
+        output.keep = new_output_hash != old_output_hash
+
+    save_json(FRAGMENT_FILE, {"sources": page_sources, "fragments": fragments})
+
+    manifest = load_json(MANIFEST_FILE, {})
+    manifest[output_file] = {"sources": page_sources, "records": digest.hexdigest(),
+                             "output": new_output_hash}
+    save_json(MANIFEST_FILE, manifest)
+
+    instrumentation.count("cards rendered", rendered)
+    instrumentation.count("cards reused", count - rendered)
+    return "written" if output.keep else "identical"
@@ -0,0 +1,47 @@
+import time
+from contextlib import contextmanager
+
+# Opt-in per-stage timings and counters for production runs.
+# Disabled by default, so stage() and count() cost next to nothing;
+# the generator enables it with --profile and prints report() at the end.
+
+enabled = False
+timings = {}
+counters = {}
+
+
+def enable():
+    global enabled
+    enabled = True
+    timings.clear()
+    counters.clear()
+
+
+@contextmanager
+def stage(name):
+    """ Times the enclosed block and adds it to the total for `name`. """
+    if not enabled:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        total, calls = timings.get(name, (0.0, 0))
+        timings[name] = (total + elapsed, calls + 1)
+
+
+def count(name, amount=1):
+    if enabled:
+        counters[name] = counters.get(name, 0) + amount
+
+
+def report():
+    """ Returns the collected timings and counters as printable lines. """
+    lines = ["--- Profile ---"]
+    for name, (total, calls) in timings.items():
+        lines.append(f"{name:<16} {total * 1000:10.2f} ms  ({calls} call{'s' if calls != 1 else ''})")
+    for name, value in counters.items():
+        lines.append(f"{name:<16} {value}")
+    return "\n".join(lines)
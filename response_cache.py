@@ -0,0 +1,146 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# Persistent response cache for the API Ninjas animal lookups.
+# Entries live in a small SQLite file so several generator processes can
+# share the same cache safely (SQLite handles the file locking for us).
+
+DEFAULT_CACHE_FILE = os.environ.get("ANIMAL_CACHE_FILE", ".animal_cache.sqlite3")
+DEFAULT_TTL_SECONDS = int(os.environ.get("ANIMAL_CACHE_TTL", 24 * 60 * 60))
+DEFAULT_MAX_ENTRIES = int(os.environ.get("ANIMAL_CACHE_MAX_ENTRIES", 1000))
+DEFAULT_MAX_STALE_SECONDS = int(os.environ.get("ANIMAL_CACHE_MAX_STALE", 60 * 60))
+
+
+def normalize_key(animal_name):
+    """ Normalizes a query name so 'Fox', ' fox ' and 'FOX' share one entry. """
+    return " ".join(str(animal_name).split()).lower()
+
+
+class ResponseCache:
+    """
+    On-disk cache of API responses keyed by normalized animal name.
+    Entries older than `ttl` are stale; stale entries may still be served
+    (while being refreshed) for at most `max_stale` more seconds. At most
+    `max_entries` are kept, evicting the least recently used ones first.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_FILE, ttl=DEFAULT_TTL_SECONDS,
+                 max_entries=DEFAULT_MAX_ENTRIES, max_stale=DEFAULT_MAX_STALE_SECONDS):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_stale = max_stale
+        self.stats = {"hits": 0, "stale_hits": 0, "misses": 0, "refetches": 0, "evictions": 0}
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY,"
+                " payload TEXT NOT NULL,"
+                " stored_at REAL NOT NULL,"
+                " last_access REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS responses_last_access"
+                " ON responses (last_access)"
+            )
+
+    def _connect(self):
+        # A fresh connection per call keeps the cache usable from threads;
+        # the timeout makes concurrent writers wait instead of failing.
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def lookup(self, animal_name):
+        """
+        Returns (data, age_in_seconds) for a cached name, or (None, None) on a miss.
+        A hit also refreshes the entry's LRU position.
+        """
+        key = normalize_key(animal_name)
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT payload, stored_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None, None
+            conn.execute(
+                "UPDATE responses SET last_access = ? WHERE key = ?", (now, key)
+            )
+        return json.loads(row[0]), now - row[1]
+
+    def store(self, animal_name, data):
+        """ Stores a response and evicts the least recently used overflow. """
+        key = normalize_key(animal_name)
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, payload, stored_at, last_access)"
+                " VALUES (?, ?, ?, ?)",
+                (key, json.dumps(data), now, now),
+            )
+            evicted = conn.execute(
+                "DELETE FROM responses WHERE key IN ("
+                " SELECT key FROM responses ORDER BY last_access DESC"
+                " LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            ).rowcount
+        if evicted > 0:
+            self._count("evictions", evicted)
+
+    def get_or_fetch(self, animal_name, fetch, stale_while_revalidate=False):
+        """
+        Returns cached data for `animal_name`, calling `fetch(animal_name)` on a
+        miss or when the entry is stale. With `stale_while_revalidate` (only
+        useful in long-running processes, whose background refresh can finish),
+        an entry less than `max_stale` past its TTL is returned immediately
+        while a background thread refreshes it.
+        """
+        data, age = self.lookup(animal_name)
+        if data is not None and age < self.ttl:
+            self._count("hits")
+            return data
+        if data is not None and stale_while_revalidate and age < self.ttl + self.max_stale:
+            self._count("stale_hits")
+            self._refresh_in_background(animal_name, fetch)
+            return data
+
+        self._count("misses" if data is None else "refetches")
+        fresh_data = fetch(animal_name)
+        if fresh_data is None:
+            # Fall back to the expired entry rather than failing outright
+            return data
+        self.store(animal_name, fresh_data)
+        return fresh_data
+
+    def _refresh_in_background(self, animal_name, fetch):
+        key = normalize_key(animal_name)
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                data = fetch(animal_name)
+                if data is not None:
+                    self.store(animal_name, data)
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=refresh, daemon=True).start()
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self.stats[name] += amount
+
+    def clear(self):
+        """ Removes every cached response. """
+        with self._connect() as conn:
+            conn.execute("DELETE FROM responses")
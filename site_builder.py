@@ -0,0 +1,240 @@
+import html
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import animal_store
+import incremental
+import template_engine
+
+# Sharded static site output: the catalogue is split into fixed-size pages
+# with navigation links, plus per-facet pages (diet, type, location) and a
+# JSON search index for client-side filtering. Pages are rendered in
+# parallel across a process pool.
+
+TEMPLATE_FILE = 'animals_template.html'
+SCHEMA_FILE = template_engine.SCHEMA_FILE
+SITE_DIR = 'site'
+PAGE_SIZE = 100
+SEARCH_INDEX_FILE = 'search_index.json'
+# Lists the pages of the last build, so only those are ever cleaned up
+PAGES_MANIFEST_FILE = '.site_pages.json'
+
+FACETS = ("diet", "type", "location")
+
+
+def slugify(value):
+    """ Turns a facet value into a file-name-safe slug ('North-America' -> 'north-america'). """
+    slug = "".join(c if c.isalnum() else "-" for c in value.strip().lower())
+    return "-".join(part for part in slug.split("-") if part) or "unknown"
+
+
+def facet_values(animal_obj, facet):
+    """ Returns the values an animal has for a facet (several for location). """
+    if facet == "location":
+        locations = animal_obj.get("locations")
+        if not isinstance(locations, list):
+            return []
+        return [location for location in locations if isinstance(location, str) and location.strip()]
+    characteristics = animal_obj.get("characteristics")
+    value = characteristics.get(facet) if isinstance(characteristics, dict) else None
+    return [value] if isinstance(value, str) and value.strip() else []
+
+
+def page_name(prefix, page_number):
+    """ Returns the file name of one page in a series: prefix.html, prefix-2.html, ... """
+    return f"{prefix}.html" if page_number == 1 else f"{prefix}-{page_number}.html"
+
+
+def render_nav(title, prefix, page_number, page_count):
+    """ Returns the navigation block for one page of a series. """
+    links = ['<a href="index.html">All animals</a>']
+    links += [f'<a href="{facet}.html">By {facet}</a>' for facet in FACETS]
+    pager = []
+    if page_number > 1:
+        pager.append(f'<a href="{page_name(prefix, page_number - 1)}">&laquo; Previous</a>')
+    pager.append(f'Page {page_number} of {page_count}')
+    if page_number < page_count:
+        pager.append(f'<a href="{page_name(prefix, page_number + 1)}">Next &raquo;</a>')
+    return (f'<nav class="pager">\n'
+            f'  <h2>{html.escape(title)}</h2>\n'
+            f'  <p>{" | ".join(links)}</p>\n'
+            f'  <p>{" | ".join(pager)}</p>\n'
+            f'</nav>\n')
+
+
+def _with_nav(head, tail, nav):
+    """ Places the navigation block right after the cards list (or before the tail). """
+    if "</ul>" in tail:
+        return head, tail.replace("</ul>", "</ul>\n" + nav, 1)
+    return head, nav + tail
+
+
+def _write_if_different(file_path, content):
+    """ Writes `content` unless the file already holds exactly these bytes. Returns True if written. """
+    try:
+        with open(file_path, "r", encoding='utf-8') as handle:
+            if handle.read() == content:
+                return False
+    except OSError:
+        pass
+    with open(file_path, "w", encoding='utf-8') as handle:
+        handle.write(content)
+    return True
+
+
+# Per-process state for page rendering: the catalogue is handed to each
+# worker once by the pool initializer, and jobs only carry record indexes.
+_catalogue = []
+_cards = {}
+
+
+def _init_worker(animals_data):
+    global _catalogue
+    _catalogue = animals_data
+    _cards.clear()
+
+
+def _card(index, render_card):
+    """ Returns the rendered card for a catalogue index, rendering it at most once per process. """
+    card = _cards.get(index)
+    if card is None:
+        card = _cards[index] = render_card(_catalogue[index])
+    return card
+
+
+def _render_page(job):
+    """
+    Process pool worker: renders one page of cards into its file.
+    The template and card schema are cached per worker process.
+    """
+    file_path, indexes, nav = job
+    head, tail = template_engine.load_template(TEMPLATE_FILE)
+    render_card = template_engine.load_card_renderer(SCHEMA_FILE)
+    head, tail = _with_nav(head, tail, nav)
+    content = "".join([head] + [_card(index, render_card) for index in indexes] + [tail])
+    return _write_if_different(file_path, content)
+
+
+def _series_jobs(output_dir, prefix, title, indexes, page_size):
+    """ Splits a list of catalogue indexes into page jobs for one series. """
+    page_count = max(1, -(-len(indexes) // page_size))
+    for page_number in range(1, page_count + 1):
+        chunk = indexes[(page_number - 1) * page_size:page_number * page_size]
+        nav = render_nav(title, prefix, page_number, page_count)
+        yield os.path.join(output_dir, page_name(prefix, page_number)), chunk, nav
+
+
+def _facet_index_html(facet, groups):
+    """ Returns the index page listing every value of a facet with its animal count. """
+    items = "".join(f'  <li><a href="{facet}-{slug}.html">{html.escape(value)}</a> ({len(indexes)})</li>\n'
+                    for slug, (value, indexes) in sorted(groups.items(), key=lambda item: item[1][0].lower()))
+    return (f'<!DOCTYPE html>\n<html lang="en">\n<head><meta charset="utf-8">'
+            f'<title>Animals by {facet}</title></head>\n<body>\n'
+            f'<h1>Animals by {facet}</h1>\n<p><a href="index.html">All animals</a></p>\n'
+            f'<ul>\n{items}</ul>\n</body>\n</html>\n')
+
+
+def build_search_index(animals_data, page_size):
+    """ Returns compact search entries: name, facet values and the page holding the card. """
+    entries = []
+    for position, animal_obj in enumerate(animals_data):
+        characteristics = animal_obj.get("characteristics")
+        characteristics = characteristics if isinstance(characteristics, dict) else {}
+        entries.append({
+            "name": animal_obj.get("name"),
+            "diet": characteristics.get("diet"),
+            "type": characteristics.get("type"),
+            "locations": facet_values(animal_obj, "location"),
+            "page": page_name("index", position // page_size + 1),
+        })
+    return entries
+
+
+def build_site(animals_data, output_dir=SITE_DIR, page_size=PAGE_SIZE, max_workers=None):
+    """
+    Builds the sharded site into `output_dir`: paginated index pages, one
+    paginated series per facet value, a facet index page per facet and the
+    JSON search index. Pages from earlier builds that are no longer part of
+    the site are deleted. Returns (page_count, written_count).
+    """
+    animals_data = [animal_obj for animal_obj in animals_data if isinstance(animal_obj, dict)]
+    os.makedirs(output_dir, exist_ok=True)
+
+    jobs = list(_series_jobs(output_dir, "index", "All animals",
+                             range(len(animals_data)), page_size))
+    slugs = {}
+    for facet in FACETS:
+        groups = {}
+        for index, animal_obj in enumerate(animals_data):
+            for value in facet_values(animal_obj, facet):
+                slug = slugs.get(value)
+                if slug is None:
+                    slug = slugs[value] = slugify(value)
+                groups.setdefault(slug, (value.strip(), []))[1].append(index)
+        for slug, (value, indexes) in groups.items():
+            jobs.extend(_series_jobs(output_dir, f"{facet}-{slug}", f"{facet.title()}: {value}",
+                                     indexes, page_size))
+        _write_if_different(os.path.join(output_dir, f"{facet}.html"),
+                            _facet_index_html(facet, groups))
+
+    _write_if_different(os.path.join(output_dir, SEARCH_INDEX_FILE),
+                        json.dumps(build_search_index(animals_data, page_size),
+                                   ensure_ascii=False, separators=(",", ":")))
+
+    if max_workers == 1 or len(jobs) < 2:
+        _init_worker(animals_data)
+        try:
+            written = sum(map(_render_page, jobs))
+        finally:
+            _init_worker([])
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                 initargs=(animals_data,)) as pool:
+            written = sum(pool.map(_render_page, jobs, chunksize=max(1, len(jobs) // 64)))
+
+    produced = {os.path.basename(file_path) for file_path, _, _ in jobs}
+    produced.update(f"{facet}.html" for facet in FACETS)
+    remove_stale_pages(output_dir, produced)
+    return len(jobs), written
+
+
+def remove_stale_pages(output_dir, produced):
+    """
+    Deletes the pages an earlier build recorded in PAGES_MANIFEST_FILE that
+    this build did not produce, such as trailing index pages or facet values
+    left over from a larger catalogue, then records `produced`. Files the
+    builder never wrote are left alone. Returns the number of files removed.
+    """
+    manifest_path = os.path.join(output_dir, PAGES_MANIFEST_FILE)
+    previous = incremental.load_json(manifest_path, [])
+    removed = 0
+    for file_name in previous if isinstance(previous, list) else []:
+        # Only plain names: never follow a tampered manifest out of output_dir
+        if file_name in produced or os.path.basename(file_name) != file_name:
+            continue
+        try:
+            os.remove(os.path.join(output_dir, file_name))
+            removed += 1
+        except FileNotFoundError:
+            pass
+    incremental.save_json(manifest_path, sorted(produced))
+    return removed
+
+
+def main():
+    """ Builds the site for the whole local catalogue: python site_builder.py [OUTPUT_DIR] """
+    output_dir = sys.argv[1] if len(sys.argv) > 1 else SITE_DIR
+    animals_data = animal_store.open_store().search()
+    if not animals_data:
+        print("Script terminated: The local animal store is empty.")
+        return
+
+    page_count, written = build_site(animals_data, output_dir)
+    print(f"\nSUCCESS! Built {page_count} pages for {len(animals_data)} animals in {output_dir}/ "
+          f"({written} changed).")
+
+
+if __name__ == "__main__":
+    main()
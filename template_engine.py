@@ -0,0 +1,133 @@
+import json
+import os
+import threading
+
+# Compiled template layer: the page template and the card schema are parsed
+# once and cached per file, and re-parsed only when the file's mtime changes.
+
+PLACEHOLDER = '__REPLACE_ANIMALS_INFO__'
+SCHEMA_FILE = 'card_schema.json'
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def _load_cached(file_path, compile_file):
+    """ Returns compile_file(file_path), reusing the cached result while the mtime is unchanged. """
+    mtime = os.stat(file_path).st_mtime_ns
+    key = (file_path, compile_file)
+    with _cache_lock:
+        cached = _cache.get(key)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    compiled = compile_file(file_path)
+    with _cache_lock:
+        _cache[key] = (mtime, compiled)
+    return compiled
+
+
+def clear_cache():
+    with _cache_lock:
+        _cache.clear()
+
+
+# --- Page template ---
+
+def _compile_template(file_path):
+    with open(file_path, "r", encoding='utf-8') as handle:
+        template_content = handle.read()
+    return split_template(template_content)
+
+
+def split_template(template_content, placeholder=PLACEHOLDER):
+    """
+    Splits the template once at the placeholder.
+    Returns (head, tail) so the cards can be streamed in between.
+    """
+    head, found, tail = template_content.partition(placeholder)
+    if not found:
+        raise ValueError(f"Placeholder {placeholder} not found in template")
+    return head, tail
+
+
+def load_template(file_path):
+    """ Returns the cached (head, tail) split of the template file. """
+    return _load_cached(file_path, _compile_template)
+
+
+# --- Card schema ---
+
+def _accessor_lines(path, var, resolved):
+    """
+    Returns source lines that follow `path` (dict keys / list indexes) from
+    `animal_obj` into `var`, leaving None in `var` when a step is missing.
+    Intermediate lookups are stored in locals recorded in `resolved`, so
+    fields sharing a prefix (e.g. "characteristics") look it up only once.
+    """
+    lines = []
+    source = "animal_obj"
+    for depth, step in enumerate(path):
+        prefix = tuple(path[:depth + 1])
+        if depth < len(path) - 1 and prefix in resolved:
+            source = resolved[prefix]
+            continue
+        target = var if depth == len(path) - 1 else f"step_{len(resolved)}"
+        if isinstance(step, int):
+            lines.append(f"{target} = {source}[{step}] if isinstance({source}, list) "
+                         f"and len({source}) > {step} else None")
+        else:
+            lines.append(f"{target} = {source}.get({step!r}) if isinstance({source}, dict) else None")
+        if target != var:
+            resolved[prefix] = target
+        source = target
+    return lines
+
+
+def compile_card(schema):
+    """
+    Compiles a card schema into a render function: animal dict -> HTML <li> string.
+    The accessor plan is generated as straight-line Python once here, so
+    rendering an animal only runs the precompiled lookups for each field.
+    """
+    namespace = {}
+    resolved = {}
+    body = [
+        "def render_card(animal_obj):",
+        "    if not isinstance(animal_obj, dict):",
+        "        return ''",
+        "    parts = ['<li class=\"cards__item\">\\n']",
+    ]
+    body += ["    " + line for line in _accessor_lines(schema["title"], "title", resolved)]
+    body += [
+        "    if isinstance(title, str):",
+        "        parts.append('  <div class=\"card__title\">' + title.strip() + '</div>\\n')",
+        "    p_content = []",
+    ]
+    for index, field in enumerate(schema["fields"]):
+        label = f"LABEL_{index}"
+        namespace[label] = f'      <strong>{field["label"]}:</strong> '
+        body += ["    " + line for line in _accessor_lines(field["path"], "value", resolved)]
+        body += [
+            "    if isinstance(value, str):",
+            f"        p_content.append({label} + value + '<br/>\\n')",
+        ]
+    body += [
+        "    if p_content:",
+        "        parts.append('  <p class=\"card__text\">\\n')",
+        "        parts.extend(p_content)",
+        "        parts.append('  </p>\\n')",
+        "    parts.append('</li>\\n')",
+        "    return ''.join(parts)",
+    ]
+    exec(compile("\n".join(body), "<card schema>", "exec"), namespace)
+    return namespace["render_card"]
+
+
+def _compile_schema_file(file_path):
+    with open(file_path, "r", encoding='utf-8') as handle:
+        return compile_card(json.load(handle))
+
+
+def load_card_renderer(file_path=SCHEMA_FILE):
+    """ Returns the cached card render function for the schema file. """
+    return _load_cached(file_path, _compile_schema_file)
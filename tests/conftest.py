@@ -0,0 +1,76 @@
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+class StubAPI(BaseHTTPRequestHandler):
+    """
+    Local stand-in for the API Ninjas /v1/animals endpoint.
+    `scripts` maps a name to the statuses to answer with, in order (the last
+    one repeats); names without a script get a 200. Every request is logged.
+    """
+
+    scripts = {}
+    retry_after = {}
+    delay = 0.0
+    requests = []
+    lock = threading.Lock()
+
+    def do_GET(self):
+        name = parse_qs(urlsplit(self.path).query)["name"][0]
+        with self.lock:
+            self.requests.append((name, time.monotonic()))
+            script = self.scripts.get(name, [200])
+            status = script.pop(0) if len(script) > 1 else script[0]
+        time.sleep(self.delay)
+
+        body = b""
+        if status == 200:
+            body = json.dumps([{"name": name.title(), "locations": ["Eurasia"],
+                                "characteristics": {"diet": "Carnivore", "type": "Mammal"}}]).encode()
+        self.send_response(status)
+        if name in self.retry_after and status != 200:
+            self.send_header("Retry-After", self.retry_after[name])
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+    @classmethod
+    def requests_for(cls, name):
+        return [at for requested, at in cls.requests if requested == name]
+
+
+_server = ThreadingHTTPServer(("127.0.0.1", 0), StubAPI)
+threading.Thread(target=_server.serve_forever, daemon=True).start()
+
+# Point the fetcher at the stub before data_fetcher is imported
+os.environ["API_URL"] = f"http://127.0.0.1:{_server.server_port}/v1/animals"
+os.environ["API_KEY"] = "test-key"
+os.environ["API_RATE_LIMIT"] = "0"
+os.environ["ANIMAL_CACHE_DISABLED"] = "1"
+os.environ["ANIMAL_STORE_FILE"] = os.path.join(tempfile.mkdtemp(), "store.sqlite3")
+
+
+@pytest.fixture
+def stub_api(monkeypatch):
+    import data_fetcher
+    monkeypatch.setattr(data_fetcher, "BACKOFF_BASE_SECONDS", 0.01)
+    StubAPI.scripts = {}
+    StubAPI.retry_after = {}
+    StubAPI.delay = 0.0
+    StubAPI.requests = []
+    return StubAPI
@@ -0,0 +1,88 @@
+import os
+import sqlite3
+
+import pytest
+
+import animal_store
+from conftest import ROOT
+
+DATASET = os.path.join(ROOT, animal_store.DATASET_FILE)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = animal_store.AnimalStore(str(tmp_path / "store.sqlite3"))
+    store.ingest_dataset(DATASET)
+    return store
+
+
+def names(records):
+    return [animal_obj["name"] for animal_obj in records]
+
+
+def test_all_carnivores_in_eurasia(store):
+    filters = animal_store.parse_filters("diet=carnivore location=eurasia")
+
+    assert names(store.search(**filters)) == ["Arctic Fox", "Fox"]
+
+
+def test_name_is_a_case_insensitive_prefix(store):
+    assert names(store.search(name="fox t")) == ["Fox Terrier"]
+    assert names(store.search(name="ARCTIC")) == ["Arctic Fox"]
+    assert store.search(name="terrier") == []
+
+
+def test_contains_uses_trigram_index_or_instr_fallback(store):
+    expected = ["Fox Terrier", "Smooth Fox Terrier", "Toy Fox Terrier", "Wire Fox Terrier"]
+    assert names(store.search(contains="terrier")) == expected
+    # Shorter than a trigram, answered by the instr() scan
+    assert names(store.search(contains="ki")) == ["Kit Fox"]
+
+    store.has_trigram = False
+    assert names(store.search(contains="TERRIER")) == expected
+
+
+def test_combines_location_taxonomy_and_limit(store):
+    assert names(store.search(location="asia", family="canidae", limit=2)) == ["Fennec Fox", "Fox"]
+
+
+def test_unknown_filter_is_rejected(store):
+    with pytest.raises(ValueError, match="Unknown filter"):
+        store.search(colour="red")
+
+
+def test_reingest_replaces_locations_and_name_index(store):
+    store.ingest([{"name": "Fox", "locations": ["Oceania"], "characteristics": {"diet": "Omnivore"}}])
+
+    assert names(store.search(location="eurasia")) == ["Arctic Fox"]
+    assert names(store.search(location="oceania")) == ["Fox", "Red Fox"]
+    assert names(store.search(contains="fox", name="fox", limit=1)) == ["Fox"]
+    assert store.count() == 19
+    with sqlite3.connect(store.path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM locations l JOIN animals a ON a.id = l.animal_id"
+                            " WHERE a.name = 'Fox'").fetchone()[0] == 1
+        if store.has_trigram:
+            assert conn.execute("SELECT COUNT(*) FROM animal_names").fetchone()[0] == 19
+
+
+def test_dataset_is_reingested_only_when_its_mtime_changes(tmp_path):
+    dataset = tmp_path / "animals.json"
+    dataset.write_text('[{"name": "Fox"}, {"name": "Lynx"}]', encoding='utf-8')
+    store = animal_store.AnimalStore(str(tmp_path / "store.sqlite3"))
+
+    assert store.ingest_dataset(str(dataset)) == 2
+    assert store.ingest_dataset(str(dataset)) == 0
+    stat = os.stat(dataset)
+    os.utime(dataset, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert store.ingest_dataset(str(dataset)) == 2
+
+
+def test_parse_filters():
+    assert animal_store.parse_filters('Diet=carnivore name="arctic fox"') == {
+        "diet": "carnivore", "name": "arctic fox"}
+    with pytest.raises(ValueError, match="Invalid filter 'colour=red'"):
+        animal_store.parse_filters("colour=red")
+    with pytest.raises(ValueError, match="Invalid filter 'carnivore'"):
+        animal_store.parse_filters("carnivore")
+    with pytest.raises(ValueError):
+        animal_store.parse_filters('name="arctic fox')
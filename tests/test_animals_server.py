@@ -0,0 +1,142 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+import animal_store
+import animals_server
+import data_fetcher
+from conftest import ROOT
+
+
+def make_service(tmp_path, **options):
+    """ Returns an AnimalService backed by a fresh store holding the bundled dataset. """
+    service = animals_server.AnimalService(**options)
+    service.store = animal_store.open_store(str(tmp_path / "store.sqlite3"),
+                                            os.path.join(ROOT, animal_store.DATASET_FILE))
+    return service
+
+
+def run_concurrently(count, function):
+    """ Calls `function` from `count` threads; returns each result or raised exception. """
+    outcomes = [None] * count
+
+    def call(slot):
+        try:
+            outcomes[slot] = function()
+        except Exception as e:
+            outcomes[slot] = e
+
+    threads = [threading.Thread(target=call, args=(slot,)) for slot in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads, outcomes
+
+
+def test_single_flight_runs_concurrent_calls_once():
+    flight = animals_server.SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def slow_lookup():
+        calls.append(1)
+        release.wait(5)
+        return ["fox"]
+
+    threads, outcomes = run_concurrently(8, lambda: flight.do("fox", slow_lookup))
+    time.sleep(0.2)  # let every thread join the in-flight call
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert outcomes == [["fox"]] * 8
+    assert flight.do("fox", lambda: ["again"]) == ["again"]
+
+
+def test_single_flight_raises_the_error_in_every_waiter():
+    flight = animals_server.SingleFlight()
+    release = threading.Event()
+
+    def failing_lookup():
+        release.wait(5)
+        raise sqlite3.OperationalError("database is locked")
+
+    threads, outcomes = run_concurrently(4, lambda: flight.do("fox", failing_lookup))
+    time.sleep(0.2)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert all(isinstance(outcome, sqlite3.OperationalError) for outcome in outcomes)
+
+
+def test_service_keeps_fetched_records_until_ttl(tmp_path, monkeypatch):
+    calls = []
+
+    def fake_fetch(animal_name):
+        calls.append(animal_name)
+        return [{"name": f"{animal_name} {len(calls)}"}]
+
+    monkeypatch.setattr(data_fetcher, "fetch_data", fake_fetch)
+    service = make_service(tmp_path, ttl=0.3)
+
+    first = service.lookup({"name": "fox"})
+    assert service.lookup({"name": " Fox "}) == first
+    assert calls == ["fox"]
+
+    time.sleep(0.4)
+    assert service.lookup({"name": "fox"}) != first
+    assert calls == ["fox", "fox"]
+
+
+def test_service_evicts_least_recently_used_records(tmp_path, monkeypatch):
+    calls = []
+    monkeypatch.setattr(data_fetcher, "fetch_data",
+                        lambda animal_name: calls.append(animal_name) or [{"name": animal_name}])
+    service = make_service(tmp_path, max_entries=2)
+
+    for name in ("fox", "lynx", "fox", "wolf", "fox", "lynx"):
+        service.lookup({"name": name})
+
+    assert calls == ["fox", "lynx", "wolf", "lynx"]
+
+
+class BrokenService:
+    def lookup(self, params):
+        raise sqlite3.OperationalError("database is locked")
+
+
+@pytest.fixture
+def server(monkeypatch):
+    monkeypatch.setattr(animals_server.AnimalRequestHandler, "log_message", lambda *args: None)
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), animals_server.AnimalRequestHandler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_port}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_unexpected_errors_are_answered_with_500(server, monkeypatch):
+    monkeypatch.setattr(animals_server.AnimalRequestHandler, "service", BrokenService())
+
+    with pytest.raises(urllib.error.HTTPError) as error:
+        urllib.request.urlopen(f"{server}/animals?diet=carnivore", timeout=5)
+    assert error.value.code == 500
+
+
+def test_bad_requests_are_answered_with_400(server, tmp_path, monkeypatch):
+    monkeypatch.setattr(animals_server.AnimalRequestHandler, "service", make_service(tmp_path))
+
+    with pytest.raises(urllib.error.HTTPError) as error:
+        urllib.request.urlopen(f"{server}/animals", timeout=5)
+    assert error.value.code == 400
+    ok = urllib.request.urlopen(f"{server}/animals?diet=carnivore&location=eurasia&format=json",
+                                timeout=5)
+    assert [animal["name"] for animal in json.load(ok)] == ["Arctic Fox", "Fox"]
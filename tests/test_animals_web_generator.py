@@ -0,0 +1,91 @@
+import os
+import shutil
+
+import pytest
+
+import animals_web_generator
+from conftest import ROOT
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    for file_name in (animals_web_generator.TEMPLATE_FILE, animals_web_generator.SCHEMA_FILE):
+        shutil.copy(os.path.join(ROOT, file_name), tmp_path)
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def test_batch_writes_combined_page(stub_api, workdir):
+    assert animals_web_generator.batch_main(["lion", "tiger"], output_file="animals.html")
+
+    page = (workdir / "animals.html").read_text(encoding='utf-8')
+    assert '<div class="card__title">Lion</div>' in page
+    assert '<div class="card__title">Tiger</div>' in page
+
+
+def test_repeated_batch_is_unchanged(stub_api, workdir, monkeypatch):
+    statuses = []
+    write_page = animals_web_generator.write_page
+
+    def recording_write_page(*args):
+        statuses.append(write_page(*args))
+        return statuses[-1]
+
+    monkeypatch.setattr(animals_web_generator, "write_page", recording_write_page)
+
+    assert animals_web_generator.batch_main(["lion", "tiger"], output_file="animals.html")
+    assert animals_web_generator.batch_main(["lion", "tiger"], output_file="animals.html")
+    assert statuses == ["written", "unchanged"]
+
+
+def test_batch_keeps_existing_page_when_every_fetch_fails(stub_api, workdir):
+    stub_api.scripts["foo"] = [404]
+    stub_api.scripts["bar"] = [404]
+    (workdir / "animals.html").write_text("previous page", encoding='utf-8')
+
+    assert not animals_web_generator.batch_main(["foo", "bar"], output_file="animals.html")
+    assert (workdir / "animals.html").read_text(encoding='utf-8') == "previous page"
+
+
+def test_cli_rejects_missing_names_file(workdir, capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        animals_web_generator.cli(["--names-file", "no-such-file.txt"])
+
+    assert exit_info.value.code == 2
+    assert "cannot read --names-file no-such-file.txt" in capsys.readouterr().err
+
+
+def test_cli_json_export_warns_and_ingests_like_batch_mode(stub_api, workdir, monkeypatch, capsys):
+    stub_api.scripts["missing"] = [404]
+    ingested = []
+    monkeypatch.setattr(animals_web_generator.animal_store.AnimalStore, "ingest",
+                        lambda store, animals: ingested.extend(animals))
+
+    assert animals_web_generator.cli(["lynx", "missing", "--format", "json",
+                                      "-o", "animals.json"]) == 0
+
+    assert "WARNING: No data for 'missing', skipping." in capsys.readouterr().out
+    assert [animal["name"] for animal in ingested] == ["Lynx"]
+    assert '"name": "Lynx"' in (workdir / "animals.json").read_text(encoding='utf-8')
+
+
+def test_cli_with_empty_names_file_fails_instead_of_prompting(workdir, capsys, monkeypatch):
+    (workdir / "names.txt").write_text("# nothing tonight\n", encoding='utf-8')
+    monkeypatch.setattr("builtins.input", lambda prompt: pytest.fail("prompted for input"))
+
+    with pytest.raises(SystemExit) as exit_info:
+        animals_web_generator.cli(["--names-file", "names.txt", "--format", "json"])
+
+    assert exit_info.value.code == 2
+    assert "no names given" in capsys.readouterr().err
+
+
+@pytest.mark.parametrize("argv", [["fox", "--per-name", "--format", "json"],
+                                  ["fox", "--per-name", "--format", "site"],
+                                  ["--query", "diet=carnivore", "--per-name"]])
+def test_cli_rejects_per_name_where_it_would_be_ignored(workdir, capsys, argv):
+    with pytest.raises(SystemExit) as exit_info:
+        animals_web_generator.cli(argv)
+
+    assert exit_info.value.code == 2
+    assert "--per-name only applies" in capsys.readouterr().err
@@ -0,0 +1,97 @@
+import time
+
+import data_fetcher
+
+
+def test_fetch_returns_json_from_api(stub_api):
+    assert data_fetcher.fetch_data("fox") == [
+        {"name": "Fox", "locations": ["Eurasia"],
+         "characteristics": {"diet": "Carnivore", "type": "Mammal"}}
+    ]
+
+
+def test_retries_server_errors_then_succeeds(stub_api):
+    stub_api.scripts["flaky"] = [503, 502, 200]
+
+    assert data_fetcher.fetch_data("flaky")[0]["name"] == "Flaky"
+    assert len(stub_api.requests_for("flaky")) == 3
+
+
+def test_gives_up_after_max_retries_with_growing_backoff(stub_api):
+    stub_api.scripts["broken"] = [500]
+
+    assert data_fetcher.fetch_data("broken") is None
+    sent = stub_api.requests_for("broken")
+    assert len(sent) == data_fetcher.MAX_RETRIES + 1
+    gaps = [later - earlier for earlier, later in zip(sent, sent[1:])]
+    # Jittered exponential backoff: each delay is at least half of base * 2**attempt
+    for attempt, gap in enumerate(gaps):
+        assert gap >= 0.5 * data_fetcher.BACKOFF_BASE_SECONDS * 2 ** attempt
+
+
+def test_honours_retry_after_on_429(stub_api):
+    stub_api.scripts["limited"] = [429, 200]
+    stub_api.retry_after["limited"] = "1"
+
+    assert data_fetcher.fetch_data("limited") is not None
+    first, second = stub_api.requests_for("limited")
+    assert second - first >= 1.0
+
+
+def test_client_errors_are_not_retried(stub_api):
+    stub_api.scripts["missing"] = [404]
+
+    assert data_fetcher.fetch_data("missing") is None
+    assert len(stub_api.requests_for("missing")) == 1
+
+
+def test_fetch_many_runs_concurrently(stub_api):
+    stub_api.delay = 0.2
+    names = [f"animal{i}" for i in range(10)]
+
+    started = time.monotonic()
+    results = data_fetcher.fetch_many(names + names[:3], max_workers=10)
+
+    assert time.monotonic() - started < 1.0
+    assert list(results) == names
+    assert all(isinstance(data, list) for data in results.values())
+
+
+def test_rate_limiter_spaces_requests_per_host():
+    limiter = data_fetcher.RateLimiter(20)
+
+    started = time.monotonic()
+    for _ in range(6):
+        limiter.wait("http://one.example/v1/animals")
+    assert time.monotonic() - started >= 0.25
+
+    started = time.monotonic()
+    limiter.wait("http://two.example/v1/animals")
+    assert time.monotonic() - started < 0.05
+
+
+def test_latency_timings_exclude_backoff(stub_api):
+    stub_api.scripts["slow-retry"] = [429, 200]
+    stub_api.retry_after["slow-retry"] = "1"
+    fetcher = data_fetcher.AnimalFetcher(limiter=data_fetcher.RateLimiter(0))
+
+    assert fetcher.fetch("slow-retry") is not None
+    assert len(fetcher.timings) == 2
+    assert all(seconds < 0.5 for _, seconds in fetcher.timings)
+
+
+def test_fetch_many_fetches_case_variants_once(stub_api):
+    results = data_fetcher.fetch_many(["Fox", "fox", " FOX ", "lynx"])
+
+    assert list(results) == ["Fox", "lynx"]
+    assert len(stub_api.requests) == 2
+
+
+def test_retry_after_is_capped(stub_api, monkeypatch):
+    monkeypatch.setattr(data_fetcher, "MAX_BACKOFF_SECONDS", 0.2)
+    stub_api.scripts["throttled"] = [429, 200]
+    stub_api.retry_after["throttled"] = "3600"
+
+    started = time.monotonic()
+    assert data_fetcher.fetch_data("throttled") is not None
+    assert time.monotonic() - started < 2.0
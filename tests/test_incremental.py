@@ -0,0 +1,45 @@
+import json
+
+import pytest
+
+import incremental
+
+
+def render_card(animal_obj):
+    return f"<li>{animal_obj['name']}</li>\n"
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "template.html").write_text("<ul>__REPLACE_ANIMALS_INFO__</ul>", encoding='utf-8')
+    return tmp_path
+
+
+def write(animals_data):
+    return incremental.write_if_changed("animals.html", animals_data, "<ul>", "</ul>",
+                                        render_card, ["template.html"])
+
+
+def test_skips_unchanged_records_and_keeps_identical_bytes(workdir):
+    animals = [{"name": f"Animal {i}"} for i in range(3)]
+
+    assert write(animals) == "written"
+    assert write(animals) == "unchanged"
+    assert write(iter(animals)) == "identical"
+    assert write(animals[:2]) == "written"
+    assert (workdir / "animals.html").read_text(encoding='utf-8') == \
+        "<ul><li>Animal 0</li>\n<li>Animal 1</li>\n</ul>"
+
+
+def test_streams_records_with_bounded_fragment_cache(workdir, monkeypatch):
+    monkeypatch.setattr(incremental, "MAX_FRAGMENTS", 5)
+
+    assert write({"name": f"Animal {i}"} for i in range(20)) == "written"
+
+    with open(incremental.FRAGMENT_FILE, encoding='utf-8') as handle:
+        fragments = json.load(handle)["fragments"]
+    assert list(fragments.values()) == [f"<li>Animal {i}</li>\n" for i in range(15, 20)]
+    with open(incremental.MANIFEST_FILE, encoding='utf-8') as handle:
+        entry = json.load(handle)["animals.html"]
+    assert entry["records"] == incremental.records_digest({"name": f"Animal {i}"} for i in range(20))
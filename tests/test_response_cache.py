@@ -0,0 +1,108 @@
+import threading
+import time
+
+import pytest
+
+import response_cache
+from response_cache import ResponseCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """ Replaces time.time in response_cache with a clock the test can advance. """
+    now = [1000.0]
+    monkeypatch.setattr(response_cache.time, "time", lambda: now[0])
+    return now
+
+
+def make_cache(tmp_path, **options):
+    return ResponseCache(str(tmp_path / "cache.sqlite3"), **options)
+
+
+class Fetcher:
+    """ Fake fetch function that counts calls and returns a versioned record. """
+
+    def __init__(self, result="fresh"):
+        self.result = result
+        self.calls = []
+        self.done = threading.Event()
+
+    def __call__(self, animal_name):
+        self.calls.append(animal_name)
+        self.done.set()
+        return None if self.result is None else [{"name": animal_name, "version": self.result}]
+
+
+def test_hit_within_ttl_does_not_fetch(tmp_path, clock):
+    cache = make_cache(tmp_path, ttl=60)
+    fetch = Fetcher()
+
+    first = cache.get_or_fetch("Fox", fetch)
+    clock[0] += 59
+    assert cache.get_or_fetch(" fox ", fetch) == first
+    assert fetch.calls == ["Fox"]
+    assert cache.stats["misses"] == 1 and cache.stats["hits"] == 1
+
+
+def test_refetches_after_ttl(tmp_path, clock):
+    cache = make_cache(tmp_path, ttl=60)
+    cache.get_or_fetch("fox", Fetcher("old"))
+    clock[0] += 61
+
+    assert cache.get_or_fetch("fox", Fetcher("new"))[0]["version"] == "new"
+    assert cache.stats["refetches"] == 1
+    clock[0] += 1
+    assert cache.lookup("fox")[0][0]["version"] == "new"
+
+
+def test_evicts_least_recently_used_at_max_entries(tmp_path, clock):
+    cache = make_cache(tmp_path, max_entries=2)
+    cache.store("fox", ["fox"])
+    clock[0] += 1
+    cache.store("lynx", ["lynx"])
+    clock[0] += 1
+    cache.lookup("fox")  # fox is now more recently used than lynx
+    clock[0] += 1
+    cache.store("wolf", ["wolf"])
+
+    assert cache.lookup("lynx") == (None, None)
+    assert cache.lookup("fox")[0] == ["fox"]
+    assert cache.lookup("wolf")[0] == ["wolf"]
+    assert cache.stats["evictions"] == 1
+
+
+def test_returns_expired_entry_when_refetch_fails(tmp_path, clock):
+    cache = make_cache(tmp_path, ttl=60)
+    cache.get_or_fetch("fox", Fetcher("old"))
+    clock[0] += 3600
+
+    assert cache.get_or_fetch("fox", Fetcher(None))[0]["version"] == "old"
+    assert cache.get_or_fetch("lynx", Fetcher(None)) is None
+
+
+def test_stale_while_revalidate_only_within_max_stale(tmp_path, clock):
+    cache = make_cache(tmp_path, ttl=60, max_stale=30)
+    cache.get_or_fetch("fox", Fetcher("old"))
+    clock[0] += 80
+
+    background = Fetcher("new")
+    assert cache.get_or_fetch("fox", background, stale_while_revalidate=True)[0]["version"] == "old"
+    assert background.done.wait(5)
+    assert cache.stats["stale_hits"] == 1
+    deadline = time.monotonic() + 5
+    while cache.lookup("fox")[0][0]["version"] != "new" and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    clock[0] += 91  # the refreshed entry is now 91s old, past ttl + max_stale
+    blocking = Fetcher("newest")
+    assert cache.get_or_fetch("fox", blocking, stale_while_revalidate=True)[0]["version"] == "newest"
+    assert cache.stats["stale_hits"] == 1 and cache.stats["refetches"] == 1
+
+
+def test_stale_entries_are_refetched_without_stale_while_revalidate(tmp_path, clock):
+    cache = make_cache(tmp_path, ttl=60, max_stale=3600)
+    cache.get_or_fetch("fox", Fetcher("old"))
+    clock[0] += 61
+
+    assert cache.get_or_fetch("fox", Fetcher("new"))[0]["version"] == "new"
+    assert cache.stats["stale_hits"] == 0
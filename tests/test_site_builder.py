@@ -0,0 +1,58 @@
+import os
+import shutil
+
+import pytest
+
+import site_builder
+from conftest import ROOT
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    for file_name in (site_builder.TEMPLATE_FILE, site_builder.SCHEMA_FILE):
+        shutil.copy(os.path.join(ROOT, file_name), tmp_path)
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def animal(name, diet, location):
+    return {"name": name, "locations": [location],
+            "characteristics": {"diet": diet, "type": "Mammal"}}
+
+
+def test_paginates_and_writes_facet_pages(workdir):
+    animals = [animal(f"Fox {i}", "Carnivore", "Eurasia") for i in range(5)]
+
+    page_count, written = site_builder.build_site(animals, "site", page_size=2, max_workers=1)
+
+    files = set(os.listdir(workdir / "site"))
+    assert {"index.html", "index-2.html", "index-3.html", "diet-carnivore-3.html",
+            "location-eurasia.html", "diet.html", "search_index.json"} <= files
+    assert page_count == written == 12
+
+
+def test_rebuild_removes_pages_no_longer_produced(workdir):
+    animals = [animal(f"Fox {i}", "Carnivore", "Eurasia") for i in range(5)]
+    os.makedirs(workdir / "site")
+    (workdir / "site" / "keep.html").write_text("not ours", encoding='utf-8')
+    (workdir / "site" / "index-9.html").write_text("not ours either", encoding='utf-8')
+    site_builder.build_site(animals, "site", page_size=2, max_workers=1)
+
+    site_builder.build_site([animal("Cow", "Herbivore", "Europe")], "site",
+                            page_size=2, max_workers=1)
+
+    files = set(os.listdir(workdir / "site"))
+    assert "index-2.html" not in files
+    assert "diet-carnivore.html" not in files
+    assert "location-eurasia.html" not in files
+    assert {"index.html", "diet-herbivore.html", "location-europe.html", "diet.html",
+            "keep.html", "index-9.html"} <= files
+
+
+def test_build_into_the_working_directory_keeps_other_html_files(workdir):
+    site_builder.build_site([animal("Fox", "Carnivore", "Eurasia")], ".", max_workers=1)
+    site_builder.build_site([animal("Cow", "Herbivore", "Europe")], ".", max_workers=1)
+
+    files = set(os.listdir(workdir))
+    assert site_builder.TEMPLATE_FILE in files
+    assert "diet-herbivore.html" in files and "diet-carnivore.html" not in files
@@ -0,0 +1,56 @@
+import json
+import os
+from collections import OrderedDict
+
+import template_engine
+from conftest import ROOT
+
+SCHEMA = {
+    "title": ["name"],
+    "fields": [
+        {"label": "Diet", "path": ["characteristics", "diet"]},
+        {"label": "Location", "path": ["locations", 0]},
+        {"label": "Type", "path": ["characteristics", "type"]},
+    ],
+}
+
+
+def test_default_schema_renders_every_field():
+    render_card = template_engine.compile_card(SCHEMA)
+    with open(os.path.join(ROOT, "animals_data.json"), "r", encoding='utf-8') as handle:
+        animal_obj = json.load(handle)[0]
+
+    assert render_card(animal_obj) == (
+        '<li class="cards__item">\n'
+        '  <div class="card__title">American Foxhound</div>\n'
+        '  <p class="card__text">\n'
+        '      <strong>Diet:</strong> Omnivore<br/>\n'
+        '      <strong>Location:</strong> North-America<br/>\n'
+        '      <strong>Type:</strong> Hound<br/>\n'
+        '  </p>\n'
+        '</li>\n'
+    )
+
+
+def test_dict_and_list_subclasses_render_like_plain_records():
+    render_card = template_engine.compile_card(SCHEMA)
+    plain = {"name": "Fox", "locations": ["Eurasia"],
+             "characteristics": {"diet": "Carnivore", "type": "Mammal"}}
+
+    class Locations(list):
+        pass
+
+    subclassed = OrderedDict(name="Fox", locations=Locations(["Eurasia"]),
+                             characteristics=OrderedDict(diet="Carnivore", type="Mammal"))
+
+    assert render_card(subclassed) == render_card(plain)
+
+
+def test_missing_and_wrongly_typed_fields_are_skipped():
+    render_card = template_engine.compile_card(SCHEMA)
+
+    assert render_card({"name": " Fox ", "locations": "Eurasia",
+                        "characteristics": {"diet": 5}}) == (
+        '<li class="cards__item">\n  <div class="card__title">Fox</div>\n</li>\n'
+    )
+    assert render_card("not a dict") == ''